@@ -11,6 +11,22 @@ class AppConfig:
     # Idiomas disponibles
     LANGUAGES = ["auto", "Spanish", "English", "French", "German", "Portuguese", "Chinese", "Japanese"]
     
+    # Modelo específico por idioma detectado (código ISO), p. ej. {"en": "small"}
+    LANGUAGE_MODELS: Dict[str, str] = {}
+    
+    # Probabilidad mínima para aceptar el idioma detectado automáticamente
+    LANGUAGE_CONFIDENCE_THRESHOLD = 0.5
+    
+    # Qué hacer con los archivos por debajo del umbral: True los omite sin
+    # decodificarlos, False los transcribe con la detección automática de Whisper
+    SKIP_LOW_CONFIDENCE = True
+    
+    # Archivos por lote en la detección previa de idioma
+    LANGUAGE_DETECTION_BATCH_SIZE = 8
+    
+    # Duración máxima (s) de los segmentos a alinear por palabra de una vez
+    MAX_WORD_ALIGNMENT_SECONDS = 300
+    
     # Tareas disponibles
     TASKS = ["transcribe", "translate"]
     
@@ -57,6 +73,10 @@ class AppConfig:
         file_ext = Path(file_path).suffix.lower()
         return file_ext in valid_extensions
     
+    def get_model_for_language(self, language: str, default_model: str) -> str:
+        """Devuelve el modelo a usar para un idioma detectado"""
+        return self.LANGUAGE_MODELS.get(language, default_model)
+    
     def get_transcription_options(self, language: str, task: str) -> Dict[str, Any]:
         """Genera opciones para la transcripción"""
         options = {}
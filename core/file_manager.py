@@ -3,7 +3,7 @@ import time
 import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 class FileManager:
     """Gestor de archivos para transcripciones"""
@@ -17,11 +17,11 @@ class FileManager:
         self.output_folder = folder_path
         os.makedirs(folder_path, exist_ok=True)
     
-    def generate_output_filename(self, audio_file_path: str) -> str:
+    def generate_output_filename(self, audio_file_path: str, suffix: str = "transcripcion") -> str:
         """Genera un nombre único para el archivo de transcripción"""
         audio_filename = Path(audio_file_path).stem
         timestamp = int(time.time())
-        output_filename = f"{audio_filename}_transcripcion_{timestamp}.txt"
+        output_filename = f"{audio_filename}_{suffix}_{timestamp}.txt"
         return os.path.join(self.output_folder, output_filename)
     
     def save_transcription(self, 
@@ -57,6 +57,33 @@ class FileManager:
         
         return output_file_path
     
+    def save_word_timestamps(self,
+                             aligned_segments: List[Dict[str, Any]],
+                             audio_file_path: str,
+                             model_name: str,
+                             start: float,
+                             end: float) -> str:
+        """Guarda las marcas de tiempo por palabra de un rango en un archivo"""
+        
+        output_file_path = self.generate_output_filename(audio_file_path, "palabras")
+        
+        with open(output_file_path, 'w', encoding='utf-8') as f:
+            # Escribir encabezado
+            f.write("=== MARCAS DE TIEMPO POR PALABRA ===\n")
+            f.write(f"Archivo: {os.path.basename(audio_file_path)}\n")
+            f.write(f"Modelo: {model_name}\n")
+            f.write(f"Rango: {start:.2f}s - {end:.2f}s\n")
+            f.write(f"Fecha: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("=" * 50 + "\n")
+            
+            # Escribir palabras agrupadas por segmento
+            for segment in aligned_segments:
+                f.write(f"\n[{segment['start']:.2f}s - {segment['end']:.2f}s]: {segment['text']}\n")
+                for word in segment["words"]:
+                    f.write(f"  [{word['start']:.2f}s - {word['end']:.2f}s]: {word['word'].strip()}\n")
+        
+        return output_file_path
+    
     def open_file(self, file_path: str) -> bool:
         """Abre un archivo con la aplicación predeterminada del sistema"""
         try:
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, Callable, List, Optional
 from models.whisper_model import WhisperModelManager
 from core.file_manager import FileManager
 from core.config import AppConfig
@@ -83,33 +83,310 @@ class TranscriptionService:
             # Configurar opciones de transcripción
             options = self.config.get_transcription_options(language, task)
             
-            # Realizar transcripción
-            result = self.whisper_manager.transcribe(audio_file, options)
+            result = self._transcribe_and_save(audio_file, model, language, task, options, progress_callback)
             
-            # Reportar progreso: Guardando
+            # Reportar progreso: Completado
             if progress_callback:
-                progress_callback("Guardando transcripción...")
+                progress_callback(f"Transcripción completada. Archivo guardado en: {result['output_file']}")
+            
+            return result
+            
+        except Exception as e:
+            error_msg = f"Error durante la transcripción: {str(e)}"
+            raise RuntimeError(error_msg)
+    
+    def transcribe_batch(self,
+                         audio_files: List[str],
+                         model: str,
+                         language: str,
+                         task: str,
+                         progress_callback: Optional[Callable[[str], None]] = None,
+                         skip_low_confidence: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Transcribe varios archivos agrupándolos por idioma
+        
+        Con language="auto" se detecta primero el idioma de todos los archivos
+        usando solo su primera ventana, en lotes. Cada archivo se transcribe
+        después con el idioma explícito. Los de baja confianza se marcan y se
+        omiten o se transcriben con la detección automática de Whisper. Un
+        archivo que falla no detiene al resto.
+        
+        Args:
+            audio_files: Rutas de los archivos de audio
+            model: Modelo Whisper a usar
+            language: Idioma del audio
+            task: Tarea (transcribe/translate)
+            progress_callback: Callback para reportar progreso
+            skip_low_confidence: Omitir los archivos de baja confianza
+                (None = AppConfig.SKIP_LOW_CONFIDENCE)
+        
+        Returns:
+            Dict con los resultados, los archivos marcados, los fallidos y las detecciones
+        """
+        
+        # Validar entradas
+        if not audio_files:
+            raise ValueError("Por favor selecciona un archivo de audio")
+        for audio_file in audio_files:
+            is_valid, error_msg = self.validate_inputs(audio_file, model, language, task)
+            if not is_valid:
+                raise ValueError(f"{audio_file}: {error_msg}")
+        for language_code, routed_model in self.config.LANGUAGE_MODELS.items():
+            if not self.config.validate_model(routed_model):
+                raise ValueError(f"Modelo inválido para el idioma {language_code}: {routed_model}")
+        
+        try:
+            detections = {}
+            flagged = []
+            failed = []
+            groups: Dict[tuple, List[str]] = {}
+            if skip_low_confidence is None:
+                skip_low_confidence = self.config.SKIP_LOW_CONFIDENCE
+            
+            if language == "auto":
+                # Reportar progreso: Detectando idioma
+                if progress_callback:
+                    progress_callback(f"Detectando idioma de {len(audio_files)} archivos...")
+                
+                self.whisper_manager.load_model(model)
+                detections, detection_errors = self.whisper_manager.detect_languages(
+                    audio_files, self.config.LANGUAGE_DETECTION_BATCH_SIZE
+                )
+                
+                for audio_file in audio_files:
+                    if audio_file in detection_errors:
+                        failed.append({'audio_file': audio_file, 'error': detection_errors[audio_file]})
+                        continue
+                    
+                    detected_language, probability = detections[audio_file]
+                    if probability < self.config.LANGUAGE_CONFIDENCE_THRESHOLD:
+                        flagged.append({
+                            'audio_file': audio_file,
+                            'language': detected_language,
+                            'probability': probability
+                        })
+                        if not skip_low_confidence:
+                            groups.setdefault((model, "auto"), []).append(audio_file)
+                        continue
+                    job_model = self.config.get_model_for_language(detected_language, model)
+                    groups.setdefault((job_model, detected_language), []).append(audio_file)
+            else:
+                groups[(model, language)] = list(audio_files)
+            
+            # Procesar por grupos para cargar cada modelo una sola vez,
+            # empezando por el modelo que ya está cargado
+            current_model = self.whisper_manager.get_current_model()
+            ordered_groups = sorted(groups.items(), key=lambda item: (item[0][0] != current_model, item[0]))
+            
+            results = []
+            processed = 0
+            total = sum(len(files) for files in groups.values())
+            for (job_model, job_language), files in ordered_groups:
+                if progress_callback:
+                    progress_callback("Cargando modelo Whisper...")
+                try:
+                    self.whisper_manager.load_model(job_model)
+                except Exception as e:
+                    failed.extend({'audio_file': audio_file, 'error': str(e)} for audio_file in files)
+                    processed += len(files)
+                    continue
+                
+                # Idioma explícito: evita repetir la detección dentro de transcribe
+                options = self.config.get_transcription_options(job_language, task)
+                
+                for audio_file in files:
+                    processed += 1
+                    if progress_callback:
+                        progress_callback(f"Procesando audio {processed}/{total} ({job_language})...")
+                    
+                    language_label = job_language
+                    if audio_file in detections:
+                        detected_language, probability = detections[audio_file]
+                        language_label = f"{job_language} (detectado {detected_language}, p={probability:.2f})"
+                    
+                    try:
+                        results.append(self._transcribe_and_save(
+                            audio_file, job_model, language_label, task, options, progress_callback
+                        ))
+                    except Exception as e:
+                        failed.append({'audio_file': audio_file, 'error': str(e)})
+            
+            # Reportar progreso: Completado
+            if progress_callback:
+                message = f"Transcripción completada: {len(results)} archivos"
+                if flagged:
+                    message += f", {len(flagged)} marcados por idioma dudoso"
+                if failed:
+                    message += f", {len(failed)} con error"
+                progress_callback(message)
+            
+            return {
+                'results': results,
+                'flagged': flagged,
+                'failed': failed,
+                'detections': detections,
+                'skip_low_confidence': skip_low_confidence
+            }
+            
+        except Exception as e:
+            error_msg = f"Error durante la transcripción: {str(e)}"
+            raise RuntimeError(error_msg)
+    
+    def _transcribe_and_save(self,
+                             audio_file: str,
+                             model: str,
+                             language: str,
+                             task: str,
+                             options: Dict[str, Any],
+                             progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Transcribe un archivo con el modelo ya cargado y guarda el resultado"""
+        
+        # Realizar transcripción
+        result = self.whisper_manager.transcribe(audio_file, options)
+        
+        # Reportar progreso: Guardando
+        if progress_callback:
+            progress_callback("Guardando transcripción...")
+        
+        # Guardar archivo
+        output_file_path = self.file_manager.save_transcription(
+            result, audio_file, model, language, task
+        )
+        
+        return {
+            'transcription': result["text"],
+            'segments': result.get("segments", []),
+            'output_file': output_file_path,
+            'full_result': result,
+            'audio_file': audio_file,
+            'model': model,
+            'task': task
+        }
+    
+    def select_segments(self,
+                        segments: List[Dict[str, Any]],
+                        start: Optional[float] = None,
+                        end: Optional[float] = None,
+                        segment_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Selecciona los segmentos indicados por id o que se solapan con el rango"""
+        selected = []
+        for segment in segments:
+            if segment_ids is not None and segment.get("id") not in segment_ids:
+                continue
+            if start is not None and segment.get("end", 0) <= start:
+                continue
+            if end is not None and segment.get("start", 0) >= end:
+                continue
+            selected.append(segment)
+        return selected
+    
+    def validate_alignment_range(self,
+                                 transcription: Dict[str, Any],
+                                 start: Optional[float] = None,
+                                 end: Optional[float] = None,
+                                 segment_ids: Optional[List[int]] = None) -> tuple[bool, str]:
+        """
+        Valida el rango pedido para las marcas de tiempo por palabra
+        
+        Returns:
+            tuple: (es_válido, mensaje_error)
+        """
+        if start is None and end is None and segment_ids is None:
+            return False, "Indica al menos el inicio o el final del rango"
+        
+        if start is not None and end is not None and start >= end:
+            return False, "El inicio del rango debe ser menor que el final"
+        
+        segments = self.select_segments(transcription['segments'], start, end, segment_ids)
+        if not segments:
+            return False, "No hay segmentos en el rango seleccionado"
+        
+        span = segments[-1].get("end", 0) - segments[0].get("start", 0)
+        if span > self.config.MAX_WORD_ALIGNMENT_SECONDS:
+            return False, (f"El rango abarca {span:.0f}s; el máximo es "
+                           f"{self.config.MAX_WORD_ALIGNMENT_SECONDS}s")
+        
+        return True, ""
+    
+    def align_word_timestamps(self,
+                              transcription: Dict[str, Any],
+                              start: Optional[float] = None,
+                              end: Optional[float] = None,
+                              segment_ids: Optional[List[int]] = None,
+                              progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Calcula marcas de tiempo por palabra solo para un rango de una transcripción
+        
+        Args:
+            transcription: Resultado devuelto por transcribe_audio
+            start: Inicio del rango en segundos (None = desde el principio)
+            end: Fin del rango en segundos (None = hasta el final)
+                Se necesita al menos un extremo o segment_ids
+            segment_ids: Ids de segmentos concretos a alinear
+            progress_callback: Callback para reportar progreso
+        
+        Returns:
+            Dict con los segmentos alineados y la ruta del archivo guardado
+        """
+        is_valid, error_msg = self.validate_alignment_range(transcription, start, end, segment_ids)
+        if not is_valid:
+            raise ValueError(error_msg)
+        
+        segments = self.select_segments(transcription['segments'], start, end, segment_ids)
+        
+        try:
+            # Reportar progreso: Cargando modelo
+            if progress_callback:
+                progress_callback("Cargando modelo Whisper...")
+            
+            # Debe ser el mismo modelo que generó los tokens de los segmentos
+            self.whisper_manager.load_model(transcription['model'])
+            
+            # Reportar progreso: Alineando
+            if progress_callback:
+                progress_callback(f"Alineando palabras de {len(segments)} segmentos...")
+            
+            aligned_segments = self.whisper_manager.align_words(
+                transcription['audio_file'],
+                segments,
+                transcription['full_result'].get("language"),
+                transcription['task'],
+                transcription['segments']
+            )
+            
+            # Descartar palabras fuera del rango pedido
+            for segment in aligned_segments:
+                segment["words"] = [
+                    word for word in segment["words"]
+                    if (start is None or word["end"] > start) and (end is None or word["start"] < end)
+                ]
+            
+            range_start = start if start is not None else segments[0].get("start", 0)
+            range_end = end if end is not None else segments[-1].get("end", 0)
             
             # Guardar archivo
-            output_file_path = self.file_manager.save_transcription(
-                result, audio_file, model, language, task
+            output_file_path = self.file_manager.save_word_timestamps(
+                aligned_segments, transcription['audio_file'], transcription['model'],
+                range_start, range_end
             )
             
             # Reportar progreso: Completado
             if progress_callback:
-                progress_callback(f"Transcripción completada. Archivo guardado en: {output_file_path}")
+                progress_callback(f"Marcas por palabra guardadas en: {output_file_path}")
             
             return {
-                'transcription': result["text"],
-                'segments': result.get("segments", []),
-                'output_file': output_file_path,
-                'full_result': result
+                'segments': aligned_segments,
+                'output_file': output_file_path
             }
             
         except Exception as e:
-            error_msg = f"Error durante la transcripción: {str(e)}"
+            error_msg = f"Error durante la alineación de palabras: {str(e)}"
             raise RuntimeError(error_msg)
     
+    def clear_audio_cache(self) -> None:
+        """Libera el audio decodificado de la última transcripción"""
+        self.whisper_manager.clear_audio_cache()
+    
     def open_transcription_file(self, file_path: str) -> bool:
         """Abre el archivo de transcripción"""
         return self.file_manager.open_file(file_path)
@@ -1,3 +1,4 @@
+import math
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from core.transcription import TranscriptionService
@@ -18,14 +19,24 @@ class WhisperTranscriptionGUI:
         
         # Variables de la interfaz
         self.audio_file = tk.StringVar()
+        self.audio_files = []
         self.output_folder = tk.StringVar(value=self.config.default_output_folder)
         self.model_var = tk.StringVar(value=self.config.default_model)
         self.language_var = tk.StringVar(value=self.config.default_language)
         self.task_var = tk.StringVar(value=self.config.default_task)
+        self.skip_low_confidence_var = tk.BooleanVar(value=self.config.SKIP_LOW_CONFIDENCE)
+        self.range_start_var = tk.StringVar()
+        self.range_end_var = tk.StringVar()
         
         # Variable para el archivo de salida actual
         self.current_output_file = None
         
+        # Última transcripción, necesaria para alinear palabras bajo demanda
+        self.current_result = None
+        
+        # Liberar el audio decodificado en caché al cambiar de archivo
+        self.audio_file.trace_add("write", self.on_audio_selection_changed)
+        
         # Configurar ventana
         self.setup_window()
         self.setup_ui()
@@ -105,6 +116,10 @@ class WhisperTranscriptionGUI:
                                      values=self.config.LANGUAGES,
                                      state="readonly", width=15)
         language_combo.grid(row=3, column=1, sticky=tk.W, pady=5)
+        
+        # Solo aplica a varios archivos con idioma "auto"
+        ttk.Checkbutton(parent, text="Omitir archivos con idioma dudoso",
+                        variable=self.skip_low_confidence_var).grid(row=3, column=2, sticky=tk.W, pady=5)
     
     def create_task_selection(self, parent):
         """Crea la selección de tarea"""
@@ -176,15 +191,43 @@ class WhisperTranscriptionGUI:
         self.open_folder_button = ttk.Button(button_frame, text="📂 Abrir Carpeta", 
                                            command=self.open_output_folder, state="disabled")
         self.open_folder_button.pack(side=tk.LEFT, padx=5)
+        
+        # Rango para marcas de tiempo por palabra
+        range_frame = ttk.Frame(parent)
+        range_frame.grid(row=2, column=0, columnspan=2)
+        
+        ttk.Label(range_frame, text="Desde (s):").pack(side=tk.LEFT)
+        ttk.Entry(range_frame, textvariable=self.range_start_var, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(range_frame, text="Hasta (s):").pack(side=tk.LEFT)
+        ttk.Entry(range_frame, textvariable=self.range_end_var, width=8).pack(side=tk.LEFT, padx=5)
+        
+        self.align_words_button = ttk.Button(range_frame, text="⏱ Palabras del rango",
+                                            command=self.start_word_alignment, state="disabled")
+        self.align_words_button.pack(side=tk.LEFT, padx=5)
     
     def browse_audio_file(self):
         """Abre el diálogo para seleccionar archivo de audio"""
-        filename = filedialog.askopenfilename(
-            title="Seleccionar archivo de audio",
+        filenames = filedialog.askopenfilenames(
+            title="Seleccionar archivos de audio",
             filetypes=self.config.AUDIO_FORMATS
         )
-        if filename:
-            self.audio_file.set(filename)
+        if filenames:
+            self.audio_files = list(filenames)
+            self.audio_file.set("; ".join(filenames))
+    
+    def get_audio_files(self) -> list:
+        """Devuelve los archivos de audio seleccionados"""
+        # La lista unida con "; " solo se muestra; si el usuario editó la
+        # entrada, su texto es una única ruta (puede contener ';')
+        if len(self.audio_files) > 1 and self.audio_file.get() == "; ".join(self.audio_files):
+            return list(self.audio_files)
+        
+        audio_file = self.audio_file.get().strip()
+        return [audio_file] if audio_file else []
+    
+    def on_audio_selection_changed(self, *args):
+        """Libera el audio en caché de la selección anterior"""
+        self.transcription_service.clear_audio_cache()
     
     def browse_output_folder(self):
         """Abre el diálogo para seleccionar carpeta de salida"""
@@ -212,11 +255,36 @@ class WhisperTranscriptionGUI:
         self.result_text.delete(1.0, tk.END)
         self.open_file_button.config(state="disabled")
         self.open_folder_button.config(state="disabled")
+        self.align_words_button.config(state="disabled")
+        
+        audio_files = self.get_audio_files()
+        
+        # Varios archivos: detección previa de idioma y transcripción por grupos
+        if len(audio_files) > 1:
+            skip_low_confidence = self.skip_low_confidence_var.get()
+            
+            def batch_task(progress_callback):
+                return self.transcription_service.transcribe_batch(
+                    audio_files=audio_files,
+                    model=self.model_var.get(),
+                    language=self.language_var.get(),
+                    task=self.task_var.get(),
+                    progress_callback=progress_callback,
+                    skip_low_confidence=skip_low_confidence
+                )
+            
+            self.background_task.run_async(
+                task_func=batch_task,
+                on_success=self.on_batch_success,
+                on_error=self.on_transcription_error,
+                on_progress=self.update_status
+            )
+            return
         
         # Crear función de transcripción
         def transcribe_task(progress_callback):
             return self.transcription_service.transcribe_audio(
-                audio_file=self.audio_file.get(),
+                audio_file=audio_files[0] if audio_files else "",
                 model=self.model_var.get(),
                 language=self.language_var.get(),
                 task=self.task_var.get(),
@@ -237,19 +305,65 @@ class WhisperTranscriptionGUI:
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(1.0, result['transcription'])
         
-        # Guardar archivo actual
+        # Guardar archivo y resultado actuales
         self.current_output_file = result['output_file']
+        self.current_result = result
         
         # Rehabilitar controles
         self.progress.stop()
         self.transcribe_button.config(state="normal")
         self.open_file_button.config(state="normal")
         self.open_folder_button.config(state="normal")
+        self.align_words_button.config(state="normal")
         
         # Mostrar mensaje de éxito
         messagebox.showinfo("Éxito", 
                            f"Transcripción completada exitosamente.\n\nArchivo guardado en:\n{self.current_output_file}")
     
+    def on_batch_success(self, result):
+        """Maneja el éxito de la transcripción de varios archivos"""
+        # Resumen por archivo
+        self.result_text.delete(1.0, tk.END)
+        for item in result['results']:
+            language = item['full_result'].get("language", "")
+            self.result_text.insert(tk.END, f"[{language}] {item['audio_file']}\n  -> {item['output_file']}\n")
+        
+        if result['flagged']:
+            if result['skip_low_confidence']:
+                title = "IDIOMA DUDOSO (no transcritos)"
+            else:
+                title = "IDIOMA DUDOSO (transcritos con detección automática)"
+            self.result_text.insert(tk.END, f"\n=== {title} ===\n")
+            for item in result['flagged']:
+                self.result_text.insert(
+                    tk.END, f"[{item['language']} p={item['probability']:.2f}] {item['audio_file']}\n"
+                )
+        
+        if result['failed']:
+            self.result_text.insert(tk.END, "\n=== CON ERROR ===\n")
+            for item in result['failed']:
+                self.result_text.insert(tk.END, f"{item['audio_file']}\n  {item['error']}\n")
+        
+        # Guardar archivo actual; la alineación de palabras es por archivo individual
+        self.current_output_file = result['results'][-1]['output_file'] if result['results'] else None
+        self.current_result = None
+        self.transcription_service.clear_audio_cache()
+        
+        # Rehabilitar controles
+        self.progress.stop()
+        self.transcribe_button.config(state="normal")
+        self.open_file_button.config(state="normal" if self.current_output_file else "disabled")
+        self.open_folder_button.config(state="normal")
+        
+        # Mostrar mensaje de éxito
+        message = f"Se transcribieron {len(result['results'])} archivos."
+        if result['flagged']:
+            action = "omitidos" if result['skip_low_confidence'] else "transcritos con detección automática"
+            message += f"\n\n{len(result['flagged'])} archivos marcados por idioma dudoso ({action})."
+        if result['failed']:
+            message += f"\n\n{len(result['failed'])} archivos con error."
+        messagebox.showinfo("Éxito", message)
+    
     def on_transcription_error(self, error):
         """Maneja errores en la transcripción"""
         # Rehabilitar controles
@@ -260,6 +374,80 @@ class WhisperTranscriptionGUI:
         # Mostrar error
         messagebox.showerror("Error", str(error))
     
+    def start_word_alignment(self):
+        """Calcula marcas de tiempo por palabra para el rango indicado"""
+        if self.background_task.is_running() or not self.current_result:
+            return
+        
+        try:
+            start = float(self.range_start_var.get()) if self.range_start_var.get().strip() else None
+            end = float(self.range_end_var.get()) if self.range_end_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "El rango debe indicarse en segundos")
+            return
+        
+        for value in (start, end):
+            if value is not None and (not math.isfinite(value) or value < 0):
+                messagebox.showerror("Error", "El rango debe indicarse en segundos")
+                return
+        
+        is_valid, error_msg = self.transcription_service.validate_alignment_range(
+            self.current_result, start, end
+        )
+        if not is_valid:
+            messagebox.showerror("Error", error_msg)
+            return
+        
+        # Preparar UI para alineación
+        self.transcribe_button.config(state="disabled")
+        self.align_words_button.config(state="disabled")
+        self.progress.start()
+        
+        # Crear función de alineación
+        def align_task(progress_callback):
+            return self.transcription_service.align_word_timestamps(
+                self.current_result,
+                start=start,
+                end=end,
+                progress_callback=progress_callback
+            )
+        
+        # Ejecutar en segundo plano
+        self.background_task.run_async(
+            task_func=align_task,
+            on_success=self.on_word_alignment_success,
+            on_error=self.on_word_alignment_error,
+            on_progress=self.update_status
+        )
+    
+    def on_word_alignment_success(self, result):
+        """Muestra las marcas de tiempo por palabra calculadas"""
+        # Añadir palabras al área de resultados
+        self.result_text.insert(tk.END, "\n\n=== PALABRAS ===\n")
+        for segment in result['segments']:
+            for word in segment['words']:
+                self.result_text.insert(tk.END, f"[{word['start']:.2f}s - {word['end']:.2f}s]: {word['word'].strip()}\n")
+        self.result_text.see(tk.END)
+        
+        # Guardar archivo actual
+        self.current_output_file = result['output_file']
+        
+        # Rehabilitar controles
+        self.progress.stop()
+        self.transcribe_button.config(state="normal")
+        self.align_words_button.config(state="normal")
+    
+    def on_word_alignment_error(self, error):
+        """Maneja errores en la alineación de palabras"""
+        # Rehabilitar controles
+        self.progress.stop()
+        self.transcribe_button.config(state="normal")
+        self.align_words_button.config(state="normal")
+        self.update_status("Error en la alineación de palabras")
+        
+        # Mostrar error
+        messagebox.showerror("Error", str(error))
+    
     def open_transcription_file(self):
         """Abre el archivo de transcripción actual"""
         if not self.current_output_file:
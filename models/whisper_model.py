@@ -1,6 +1,8 @@
+import os
 import sys
 import subprocess
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 
 try:
     import whisper
@@ -9,12 +11,30 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openai-whisper"])
     import whisper
 
+import numpy as np
+import torch
+from whisper.audio import SAMPLE_RATE, N_SAMPLES, N_FRAMES, HOP_LENGTH
+from whisper.timing import find_alignment, merge_punctuations
+from whisper.tokenizer import get_tokenizer
+from utils.alignment_utils import group_segments_by_window
+
+# Puntuación que Whisper fusiona con la palabra vecina (valores por defecto de transcribe)
+PREPEND_PUNCTUATIONS = "\"'“¿([{-"
+APPEND_PUNCTUATIONS = "\"'.。,，!！?？:：”)]}、"
+
 class WhisperModelManager:
     """Gestor del modelo Whisper"""
     
+    # Número de archivos decodificados que se mantienen en memoria. Cada archivo
+    # ocupa 64 KB por segundo (16 kHz float32): ~460 MB para 2 horas de audio.
+    # Se libera con clear_audio_cache().
+    AUDIO_CACHE_SIZE = 1
+    
     def __init__(self):
         self.model = None
         self.current_model_name = None
+        self._audio_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._language_cache: Dict[tuple, Tuple[str, float]] = {}
     
     def load_model(self, model_name: str) -> None:
         """Carga el modelo Whisper especificado"""
@@ -27,7 +47,201 @@ class WhisperModelManager:
         if self.model is None:
             raise RuntimeError("Modelo no cargado. Llama a load_model() primero.")
         
-        return self.model.transcribe(audio_path, **options)
+        return self.model.transcribe(self.load_audio(audio_path), **options)
+    
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        """Decodifica el audio con FFmpeg reutilizando la caché si ya fue decodificado"""
+        key = (os.path.abspath(audio_path), os.path.getmtime(audio_path))
+        if key in self._audio_cache:
+            self._audio_cache.move_to_end(key)
+            return self._audio_cache[key]
+        
+        audio = whisper.load_audio(audio_path)
+        self._audio_cache[key] = audio
+        while len(self._audio_cache) > self.AUDIO_CACHE_SIZE:
+            self._audio_cache.popitem(last=False)
+        return audio
+    
+    def clear_audio_cache(self) -> None:
+        """Libera el audio decodificado que se mantiene en memoria"""
+        self._audio_cache.clear()
+    
+    def load_audio_window(self, audio_path: str, seconds: int = 30) -> np.ndarray:
+        """Decodifica solo los primeros segundos del audio"""
+        key = (os.path.abspath(audio_path), os.path.getmtime(audio_path))
+        if key in self._audio_cache:
+            return self._audio_cache[key][:seconds * SAMPLE_RATE]
+        
+        # -t antes de -i limita la lectura de la entrada: FFmpeg deja de
+        # decodificar tras la ventana en todas las plataformas
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0",
+            "-t", str(seconds),
+            "-i", audio_path,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+            "-ar", str(SAMPLE_RATE),
+            "-"
+        ]
+        try:
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"No se pudo cargar el audio: {e.stderr.decode(errors='replace')}") from e
+        
+        return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+    
+    def detect_languages(self,
+                         audio_paths: List[str],
+                         batch_size: int = 8) -> Tuple[Dict[str, Tuple[str, float]], Dict[str, str]]:
+        """
+        Detecta el idioma de varios archivos usando solo su primera ventana de 30s
+        
+        Los archivos se procesan en lotes y el resultado se guarda en caché
+        por archivo y modelo. Un archivo que falla no detiene al resto.
+        
+        Args:
+            audio_paths: Rutas de los archivos de audio
+            batch_size: Número de archivos por lote
+        
+        Returns:
+            tuple: (Dict ruta -> (código de idioma, probabilidad),
+                    Dict ruta -> mensaje de error)
+        """
+        if self.model is None:
+            raise RuntimeError("Modelo no cargado. Llama a load_model() primero.")
+        
+        detections = {}
+        errors = {}
+        pending = []
+        for audio_path in audio_paths:
+            try:
+                key = (os.path.abspath(audio_path), os.path.getmtime(audio_path), self.current_model_name)
+            except OSError as e:
+                errors[audio_path] = str(e)
+                continue
+            if key in self._language_cache:
+                detections[audio_path] = self._language_cache[key]
+            else:
+                pending.append((audio_path, key))
+        
+        for i in range(0, len(pending), batch_size):
+            batch = []
+            mels = []
+            for audio_path, key in pending[i:i + batch_size]:
+                try:
+                    audio = whisper.pad_or_trim(self.load_audio_window(audio_path))
+                    mels.append(whisper.log_mel_spectrogram(audio, self.model.dims.n_mels))
+                    batch.append((audio_path, key))
+                except Exception as e:
+                    errors[audio_path] = str(e)
+            
+            if not batch:
+                continue
+            
+            try:
+                mel_batch = torch.stack(mels).to(self.model.device).to(self._get_dtype())
+                _, probs = self.model.detect_language(mel_batch)
+            except Exception as e:
+                for audio_path, _ in batch:
+                    errors[audio_path] = str(e)
+                continue
+            
+            for (audio_path, key), language_probs in zip(batch, probs):
+                language = max(language_probs, key=language_probs.get)
+                detection = (language, float(language_probs[language]))
+                self._language_cache[key] = detection
+                detections[audio_path] = detection
+        
+        return detections, errors
+    
+    def _get_dtype(self) -> torch.dtype:
+        """Tipo de dato usado por el modelo en el dispositivo actual"""
+        return torch.float16 if self.model.device.type == "cuda" else torch.float32
+    
+    def align_words(self,
+                    audio_path: str,
+                    segments: List[Dict[str, Any]],
+                    language: str,
+                    task: str = "transcribe",
+                    all_segments: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Calcula marcas de tiempo por palabra solo para los segmentos indicados
+        
+        Agrupa los segmentos consecutivos que caben en una ventana de 30s y
+        alinea sus tokens ya decodificados de una sola vez, como hace Whisper,
+        sin volver a decodificar el texto. La ventana llega hasta el final del
+        segmento siguiente porque el final de un segmento suele cortar la
+        última palabra.
+        
+        Args:
+            audio_path: Ruta del archivo de audio
+            segments: Segmentos de una transcripción previa (con "tokens")
+            language: Idioma detectado en la transcripción
+            task: Tarea usada en la transcripción (transcribe/translate)
+            all_segments: Todos los segmentos de la transcripción, para conocer
+                el segmento siguiente a cada uno (por defecto, segments)
+        
+        Returns:
+            Lista de segmentos con su lista de palabras en "words"
+        """
+        if self.model is None:
+            raise RuntimeError("Modelo no cargado. Llama a load_model() primero.")
+        
+        audio = self.load_audio(audio_path)
+        tokenizer = get_tokenizer(self.model.is_multilingual,
+                                  num_languages=self.model.num_languages,
+                                  language=language,
+                                  task=task)
+        dtype = self._get_dtype()
+        
+        aligned_segments = []
+        for window in group_segments_by_window(segments, all_segments):
+            window_start = window["start"]
+            tokens_per_segment = [
+                [token for token in segment.get("tokens", []) if token < tokenizer.eot]
+                for segment in window["segments"]
+            ]
+            text_tokens = [token for tokens in tokens_per_segment for token in tokens]
+            
+            clip = audio[int(window_start * SAMPLE_RATE):int(window["end"] * SAMPLE_RATE)][:N_SAMPLES]
+            alignment = []
+            if text_tokens and clip.size > 0:
+                mel = whisper.log_mel_spectrogram(clip, self.model.dims.n_mels, padding=N_SAMPLES)
+                mel = whisper.pad_or_trim(mel, N_FRAMES).to(self.model.device).to(dtype)
+                num_frames = min(clip.size // HOP_LENGTH, N_FRAMES)
+                
+                alignment = find_alignment(self.model, tokenizer, text_tokens, mel, num_frames)
+                merge_punctuations(alignment, PREPEND_PUNCTUATIONS, APPEND_PUNCTUATIONS)
+            
+            # Repartir las palabras entre los segmentos según sus tokens
+            word_index = 0
+            for segment, segment_tokens in zip(window["segments"], tokens_per_segment):
+                words = []
+                saved_tokens = 0
+                while word_index < len(alignment) and saved_tokens < len(segment_tokens):
+                    timing = alignment[word_index]
+                    if timing.word:
+                        # Acotar a la ventana: la última palabra puede pasar del
+                        # final del segmento hasta el inicio del siguiente
+                        word_start = min(max(window_start + float(timing.start), window_start), window["limit"])
+                        word_end = min(max(window_start + float(timing.end), word_start), window["limit"])
+                        words.append({
+                            "word": timing.word,
+                            "start": round(word_start, 2),
+                            "end": round(word_end, 2),
+                            "probability": float(timing.probability)
+                        })
+                    saved_tokens += len(timing.tokens)
+                    word_index += 1
+                
+                aligned_segments.append({
+                    "id": segment.get("id"),
+                    "start": segment.get("start", 0),
+                    "end": segment.get("end", 0),
+                    "text": segment.get("text", ""),
+                    "words": words
+                })
+        
+        return aligned_segments
     
     def is_loaded(self) -> bool:
         """Verifica si hay un modelo cargado"""
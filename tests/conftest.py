@@ -0,0 +1,16 @@
+import os
+import sys
+import types
+
+# Agregar el directorio raíz al path para imports relativos (como main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sustituir el gestor de Whisper para no necesitar whisper, torch ni numpy;
+# los tests inyectan su propio gestor falso en el servicio
+fake_whisper_model = types.ModuleType("models.whisper_model")
+
+class WhisperModelManager:
+    """Gestor vacío usado solo para construir TranscriptionService"""
+
+fake_whisper_model.WhisperModelManager = WhisperModelManager
+sys.modules["models.whisper_model"] = fake_whisper_model
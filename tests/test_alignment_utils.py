@@ -0,0 +1,47 @@
+from utils.alignment_utils import group_segments_by_window
+
+def make_segments(bounds):
+    return [{"id": i, "start": start, "end": end} for i, (start, end) in enumerate(bounds)]
+
+def test_consecutive_segments_share_window():
+    segments = make_segments([(0, 5), (5, 12), (12, 20), (20, 28)])
+    groups = group_segments_by_window(segments[:3], segments)
+    
+    assert len(groups) == 1
+    assert [s["id"] for s in groups[0]["segments"]] == [0, 1, 2]
+    assert groups[0]["start"] == 0
+    # Ventana hasta el final del segmento siguiente, límite en su inicio
+    assert groups[0]["end"] == 28
+    assert groups[0]["limit"] == 20
+
+def test_window_is_split_at_thirty_seconds():
+    segments = make_segments([(0, 10), (10, 25), (25, 35), (35, 50)])
+    groups = group_segments_by_window(segments, segments)
+    
+    assert [[s["id"] for s in g["segments"]] for g in groups] == [[0, 1], [2, 3]]
+    assert groups[0]["end"] == 30
+    assert groups[1]["start"] == 25
+    assert groups[1]["end"] == 55
+
+def test_non_consecutive_segments_are_split():
+    segments = make_segments([(0, 5), (5, 10), (10, 15)])
+    groups = group_segments_by_window([segments[0], segments[2]], segments)
+    
+    assert [[s["id"] for s in g["segments"]] for g in groups] == [[0], [2]]
+    assert groups[0]["end"] == 10
+    assert groups[0]["limit"] == 5
+
+def test_last_segment_window_without_next():
+    segments = make_segments([(0, 5), (5, 10)])
+    groups = group_segments_by_window(segments[1:], segments)
+    
+    assert groups[0]["start"] == 5
+    assert groups[0]["end"] == 35
+    assert groups[0]["limit"] == 35
+
+def test_limit_never_before_segment_end():
+    # Segmento siguiente que empieza antes del final del actual
+    segments = make_segments([(0, 6), (5, 10)])
+    groups = group_segments_by_window(segments[:1], segments)
+    
+    assert groups[0]["limit"] == 6
@@ -0,0 +1,188 @@
+import pytest
+
+from core.transcription import TranscriptionService
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # AppConfig crea la carpeta de salida por defecto en el directorio actual
+    monkeypatch.chdir(tmp_path)
+    return TranscriptionService(str(tmp_path / "salida"))
+
+def make_transcription(bounds):
+    segments = [{"id": i, "start": start, "end": end} for i, (start, end) in enumerate(bounds)]
+    return {'segments': segments}
+
+def test_select_segments_by_range(service):
+    segments = make_transcription([(0, 5), (5, 10), (10, 15), (15, 20)])['segments']
+    
+    selected = service.select_segments(segments, start=6, end=12)
+    
+    assert [s["id"] for s in selected] == [1, 2]
+
+def test_select_segments_range_bounds_are_exclusive(service):
+    segments = make_transcription([(0, 5), (5, 10), (10, 15)])['segments']
+    
+    assert [s["id"] for s in service.select_segments(segments, start=5)] == [1, 2]
+    assert [s["id"] for s in service.select_segments(segments, end=10)] == [0, 1]
+
+def test_select_segments_by_id(service):
+    segments = make_transcription([(0, 5), (5, 10), (10, 15)])['segments']
+    
+    selected = service.select_segments(segments, segment_ids=[0, 2])
+    
+    assert [s["id"] for s in selected] == [0, 2]
+
+def test_alignment_range_requires_a_bound(service):
+    transcription = make_transcription([(0, 5), (5, 10)])
+    
+    is_valid, error_msg = service.validate_alignment_range(transcription)
+    
+    assert not is_valid
+    assert error_msg
+
+def test_alignment_range_rejects_inverted_range(service):
+    transcription = make_transcription([(0, 5), (5, 10)])
+    
+    is_valid, _ = service.validate_alignment_range(transcription, start=8, end=2)
+    
+    assert not is_valid
+
+def test_alignment_range_rejects_empty_selection(service):
+    transcription = make_transcription([(0, 5), (5, 10)])
+    
+    is_valid, _ = service.validate_alignment_range(transcription, start=20)
+    
+    assert not is_valid
+
+def test_alignment_range_caps_span(service):
+    max_seconds = service.config.MAX_WORD_ALIGNMENT_SECONDS
+    transcription = make_transcription([(i * 10, (i + 1) * 10) for i in range(max_seconds // 10 + 5)])
+    
+    assert not service.validate_alignment_range(transcription, start=0)[0]
+    assert service.validate_alignment_range(transcription, start=0, end=30)[0]
+
+class FakeWhisperManager:
+    """Gestor de Whisper falso que registra cargas y transcripciones"""
+    
+    def __init__(self, detections=None, detection_errors=None, failing_files=()):
+        self.detections = detections or {}
+        self.detection_errors = detection_errors or {}
+        self.failing_files = set(failing_files)
+        self.current_model = None
+        self.loaded_models = []
+        self.transcribed = []
+    
+    def load_model(self, model_name):
+        if model_name != self.current_model:
+            self.loaded_models.append(model_name)
+            self.current_model = model_name
+    
+    def get_current_model(self):
+        return self.current_model
+    
+    def detect_languages(self, audio_paths, batch_size=8):
+        detections = {path: self.detections[path] for path in audio_paths if path in self.detections}
+        errors = {path: self.detection_errors[path] for path in audio_paths if path in self.detection_errors}
+        return detections, errors
+    
+    def transcribe(self, audio_path, options):
+        if audio_path in self.failing_files:
+            raise RuntimeError("fallo de decodificación")
+        self.transcribed.append((audio_path, self.current_model, dict(options)))
+        return {"text": "texto", "segments": [], "language": options.get("language", "auto")}
+
+@pytest.fixture
+def audio_files(tmp_path):
+    paths = {}
+    for name in ["a", "b", "c", "d"]:
+        path = tmp_path / f"{name}.mp3"
+        path.write_bytes(b"")
+        paths[name] = str(path)
+    return paths
+
+def test_batch_dispatches_with_explicit_language_and_loads_each_model_once(service, audio_files, monkeypatch):
+    monkeypatch.setattr(service.config, "LANGUAGE_MODELS", {"es": "small"})
+    manager = FakeWhisperManager(detections={
+        audio_files["a"]: ("es", 0.9),
+        audio_files["b"]: ("en", 0.95),
+        audio_files["c"]: ("es", 0.8),
+    })
+    service.whisper_manager = manager
+    
+    result = service.transcribe_batch(
+        [audio_files["a"], audio_files["b"], audio_files["c"]], "turbo", "auto", "transcribe"
+    )
+    
+    assert manager.loaded_models == ["turbo", "small"]
+    assert [(path, model, options["language"]) for path, model, options in manager.transcribed] == [
+        (audio_files["b"], "turbo", "en"),
+        (audio_files["a"], "small", "es"),
+        (audio_files["c"], "small", "es"),
+    ]
+    assert len(result['results']) == 3
+    assert result['flagged'] == []
+    assert result['failed'] == []
+
+def test_batch_skips_low_confidence_files_by_default(service, audio_files):
+    manager = FakeWhisperManager(detections={
+        audio_files["a"]: ("es", 0.9),
+        audio_files["d"]: ("fr", 0.2),
+    })
+    service.whisper_manager = manager
+    
+    result = service.transcribe_batch([audio_files["a"], audio_files["d"]], "turbo", "auto", "transcribe")
+    
+    assert [path for path, _, _ in manager.transcribed] == [audio_files["a"]]
+    assert [item['audio_file'] for item in result['flagged']] == [audio_files["d"]]
+    assert result['skip_low_confidence'] is True
+
+def test_batch_can_transcribe_low_confidence_files_with_auto_detection(service, audio_files):
+    manager = FakeWhisperManager(detections={audio_files["d"]: ("fr", 0.2)})
+    service.whisper_manager = manager
+    
+    result = service.transcribe_batch(
+        [audio_files["d"]], "turbo", "auto", "transcribe", skip_low_confidence=False
+    )
+    
+    assert manager.transcribed == [(audio_files["d"], "turbo", {})]
+    assert len(result['flagged']) == 1
+    assert result['skip_low_confidence'] is False
+
+def test_batch_isolates_failed_files(service, audio_files):
+    manager = FakeWhisperManager(
+        detections={
+            audio_files["a"]: ("es", 0.9),
+            audio_files["c"]: ("es", 0.9),
+        },
+        detection_errors={audio_files["b"]: "audio ilegible"},
+        failing_files=[audio_files["c"]]
+    )
+    service.whisper_manager = manager
+    
+    result = service.transcribe_batch(
+        [audio_files["a"], audio_files["b"], audio_files["c"]], "turbo", "auto", "transcribe"
+    )
+    
+    assert [item['audio_file'] for item in result['results']] == [audio_files["a"]]
+    assert {item['audio_file']: item['error'] for item in result['failed']} == {
+        audio_files["b"]: "audio ilegible",
+        audio_files["c"]: "fallo de decodificación",
+    }
+
+def test_batch_rejects_invalid_routed_model(service, audio_files, monkeypatch):
+    monkeypatch.setattr(service.config, "LANGUAGE_MODELS", {"es": "inexistente"})
+    manager = FakeWhisperManager()
+    service.whisper_manager = manager
+    
+    with pytest.raises(ValueError):
+        service.transcribe_batch([audio_files["a"]], "turbo", "auto", "transcribe")
+    assert manager.loaded_models == []
+
+def test_batch_with_manual_language_skips_detection(service, audio_files):
+    manager = FakeWhisperManager()
+    service.whisper_manager = manager
+    
+    result = service.transcribe_batch([audio_files["a"], audio_files["b"]], "base", "Spanish", "transcribe")
+    
+    assert [options["language"] for _, _, options in manager.transcribed] == ["Spanish", "Spanish"]
+    assert result['detections'] == {}
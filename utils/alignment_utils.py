@@ -0,0 +1,72 @@
+from typing import Dict, Any, List, Optional
+
+# Duración de la ventana de audio que procesa Whisper de una vez
+WINDOW_SECONDS = 30.0
+
+def group_segments_by_window(segments: List[Dict[str, Any]],
+                             all_segments: Optional[List[Dict[str, Any]]] = None,
+                             window_seconds: float = WINDOW_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Agrupa segmentos consecutivos que caben en una misma ventana de audio
+
+    Cada grupo empieza en el inicio de su primer segmento y admite segmentos
+    consecutivos (según all_segments) mientras terminen dentro de la ventana,
+    para codificar el audio una sola vez por grupo.
+
+    Args:
+        segments: Segmentos seleccionados, en orden
+        all_segments: Todos los segmentos de la transcripción, para saber qué
+            segmentos son consecutivos y cuál sigue a cada grupo (por defecto, segments)
+        window_seconds: Duración máxima de la ventana
+
+    Returns:
+        Lista de grupos con:
+            segments: segmentos del grupo
+            start: inicio de la ventana
+            end: fin de la ventana (hasta el final del segmento siguiente, sin pasar de window_seconds)
+            limit: límite para el final de la última palabra (inicio del segmento siguiente)
+    """
+    ordered_segments = all_segments if all_segments is not None else segments
+    positions = {segment.get("id"): i for i, segment in enumerate(ordered_segments)}
+
+    groups = []
+    current = []
+    for segment in segments:
+        if current:
+            previous_position = positions.get(current[-1].get("id"))
+            position = positions.get(segment.get("id"))
+            is_consecutive = (previous_position is not None and position is not None
+                              and position == previous_position + 1)
+            fits = segment.get("end", 0) <= current[0].get("start", 0) + window_seconds
+            if not (is_consecutive and fits):
+                groups.append(_build_window(current, ordered_segments, positions, window_seconds))
+                current = []
+        current.append(segment)
+
+    if current:
+        groups.append(_build_window(current, ordered_segments, positions, window_seconds))
+
+    return groups
+
+def _build_window(group: List[Dict[str, Any]],
+                  ordered_segments: List[Dict[str, Any]],
+                  positions: Dict[Any, int],
+                  window_seconds: float) -> Dict[str, Any]:
+    """Calcula los límites de la ventana de un grupo de segmentos"""
+    start = group[0].get("start", 0)
+    last_end = group[-1].get("end", 0)
+    end = start + window_seconds
+    limit = end
+
+    position = positions.get(group[-1].get("id"))
+    if position is not None and position + 1 < len(ordered_segments):
+        next_segment = ordered_segments[position + 1]
+        end = min(end, max(next_segment.get("end", 0), last_end))
+        limit = min(end, max(next_segment.get("start", 0), last_end))
+
+    return {
+        "segments": group,
+        "start": start,
+        "end": end,
+        "limit": limit
+    }